@@ -1,10 +1,101 @@
 import os
-import glob
+import hashlib
+import mmap
+import re
+import sqlite3
+import struct
+import tempfile
+import warnings
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-from shapely.geometry import Point
-from exif import Image as ExifImage  # pip install exif
+import pyogrio
+import shapely
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, _dms_arrays_to_dd falls back to NumPy
+    njit = None
+
+# Returned by _parse_one for each usable photo
+_PhotoRecord = namedtuple('_PhotoRecord', [
+    'filename', 'latitude', 'latitude_ref', 'longitude', 'longitude_ref', 'altitude',
+    'image_description', 'create_date', 'orientation', 'group_value', 'parsed_dict',
+])
+# Returned by _parse_one for a photo whose group value is not allowed
+_InvalidFolderValue = namedtuple('_InvalidFolderValue', ['photo_path', 'group_value'])
+
+# EXIF tags read by read_gps_exif_fast, named like the exif package's attributes.
+# The pointer tags lead to the Exif and GPS sub-IFDs.
+_EXIF_HEADER = b'Exif\x00\x00'
+_EXIF_IFD_POINTER = 0x8769
+_GPS_IFD_POINTER = 0x8825
+_IFD0_TAGS = {
+    0x010E: 'image_description',
+    0x0112: 'orientation',
+    _EXIF_IFD_POINTER: 'exif_ifd',
+    _GPS_IFD_POINTER: 'gps_ifd',
+}
+_EXIF_TAGS = {0x9003: 'datetime_original'}
+_GPS_TAGS = {
+    0x0001: 'gps_latitude_ref',
+    0x0002: 'gps_latitude',
+    0x0003: 'gps_longitude_ref',
+    0x0004: 'gps_longitude',
+    0x0005: 'gps_altitude_ref',
+    0x0006: 'gps_altitude',
+}
+
+# Byte size of each TIFF field type we may decode (BYTE, ASCII, SHORT, LONG, RATIONAL, UNDEFINED)
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1}
+_SEGMENT_LENGTH = struct.Struct('>H')
+# (endian prefix, IFD entry count, LONG, 12-byte IFD entry) per TIFF byte order
+_TIFF_STRUCTS = {
+    bo: (e, struct.Struct(e + 'H'), struct.Struct(e + 'I'), struct.Struct(e + 'HHI4s'))
+    for bo, e in ((b'II', '<'), (b'MM', '>'))
+}
+
+# GDAL options for the GeoPackage writes: a 200 MB SQLite page cache
+_GDAL_CONFIG_OPTIONS = {'OGR_SQLITE_CACHE': 200}
+
+# Groups with more features than this are sorted along a Hilbert curve before writing
+_HILBERT_SORT_MIN_FEATURES = 1000
+
+# Photos are parsed in chunks of this many. Peak memory is bounded by one chunk
+# plus the largest group (and its existing GPKG), not by all photos at once.
+_CHUNK_SIZE = 50_000
+
+# One "key-value" segment of an image description; splits on the first dash and
+# strips whitespace around both parts
+_KEY_VALUE_PATTERN = re.compile(r'(?:^|;)\s*([^;\-]*?)\s*-\s*([^;]*?)\s*(?=;|$)')
+
+# Envelope size in bytes for each envelope indicator of a GeoPackage geometry blob
+_GPKG_ENVELOPE_SIZES = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+def _dms_to_dd_arr(degrees, minutes, seconds, sign):
+    return sign * (degrees + minutes / 60.0 + seconds / 3600.0)
+
+if njit is not None:
+    # Not parallel=True: numba's threading layer isn't fork-safe, and the photos
+    # are parsed in a forked process pool
+    @njit(cache=True)
+    def _dms_to_dd_jit(degrees, minutes, seconds, sign):
+        out = np.empty(degrees.shape[0])
+        for i in range(degrees.shape[0]):
+            out[i] = sign[i] * (degrees[i] + minutes[i] / 60.0 + seconds[i] / 3600.0)
+        return out
+
+    # Compile at import so the first real call doesn't pay for the JIT. If that
+    # fails (e.g. an unreadable numba cache), keep the NumPy version.
+    try:
+        _dms_to_dd_jit(np.zeros(1), np.zeros(1), np.zeros(1), np.ones(1))
+        _dms_to_dd_arr = _dms_to_dd_jit
+    except Exception:
+        pass
 
 def dms_to_dd(dms_tuple, ref):
     """
@@ -17,33 +108,393 @@ def dms_to_dd(dms_tuple, ref):
         dd = -dd
     return dd
 
+def _dms_arrays_to_dd(degrees, minutes, seconds, refs):
+    """
+    Array version of dms_to_dd: convert arrays of degrees, minutes, seconds +
+    references into an array of decimal degrees.
+    """
+    sign = np.where(np.isin(refs, ['S', 'W']), -1.0, 1.0)
+    return _dms_to_dd_arr(degrees, minutes, seconds, sign)
+
+def _decode_tiff_value(buf, tiff_start, field_type, count, raw, structs):
+    """
+    Decode the value of one IFD entry. Values that fit in 4 bytes are stored
+    inline in the entry, larger ones live at an offset from the TIFF header.
+    """
+    endian, _, long_struct, _ = structs
+    size = _TIFF_TYPE_SIZES.get(field_type, 1) * count
+    if size <= 4:
+        data, start = raw, 0
+    else:
+        data, start = buf, tiff_start + long_struct.unpack(raw)[0]
+
+    if field_type == 2:  # ASCII, NUL-terminated
+        return bytes(data[start:start + count]).split(b'\x00', 1)[0].decode('utf-8', 'replace')
+    if field_type == 3:
+        values = struct.unpack_from(f'{endian}{count}H', data, start)
+    elif field_type == 4:
+        values = struct.unpack_from(f'{endian}{count}I', data, start)
+    elif field_type == 5:  # RATIONAL: numerator/denominator pairs
+        pairs = struct.unpack_from(f'{endian}{2 * count}I', data, start)
+        values = tuple(
+            num / den if den else float('nan')
+            for num, den in zip(pairs[::2], pairs[1::2])
+        )
+    else:
+        values = tuple(bytes(data[start:start + count]))
+    return values[0] if count == 1 else values
+
+def _read_ifd(buf, tiff_start, ifd_offset, wanted, structs):
+    """
+    Read the entries of one IFD whose tag is in `wanted`, returning
+    {name: value}. The whole IFD is scanned: the spec sorts entries by tag, but
+    some writers don't.
+    """
+    _, count_struct, _, entry_struct = structs
+    pos = tiff_start + ifd_offset
+    (n_entries,) = count_struct.unpack_from(buf, pos)
+    pos += 2
+    tags = {}
+    for _ in range(n_entries):
+        tag, field_type, count, raw = entry_struct.unpack_from(buf, pos)
+        pos += 12
+        if tag in wanted:
+            tags[wanted[tag]] = _decode_tiff_value(buf, tiff_start, field_type, count, raw, structs)
+    return tags
+
+def _read_exif_segment(buf):
+    """
+    Find the Exif APP1 segment of a JPEG and read the tags we need from its
+    TIFF structure. Returns None if there is no Exif segment.
+    """
+    if buf[:2] != b'\xff\xd8':
+        return None
+
+    # Walk the segment markers until the Exif APP1; metadata always precedes the scan
+    pos = 2
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS
+            return None
+        (length,) = _SEGMENT_LENGTH.unpack_from(buf, pos + 2)
+        if marker == 0xE1 and buf[pos + 4:pos + 10] == _EXIF_HEADER:
+            tiff_start = pos + 10
+            break
+        pos += 2 + length
+    else:
+        return None
+
+    structs = _TIFF_STRUCTS.get(bytes(buf[tiff_start:tiff_start + 2]))
+    if structs is None:
+        return None
+    ifd0_offset = structs[2].unpack_from(buf, tiff_start + 4)[0]
+
+    tags = _read_ifd(buf, tiff_start, ifd0_offset, _IFD0_TAGS, structs)
+    exif_ifd = tags.pop('exif_ifd', None)
+    gps_ifd = tags.pop('gps_ifd', None)
+    if exif_ifd is not None:
+        tags.update(_read_ifd(buf, tiff_start, exif_ifd, _EXIF_TAGS, structs))
+    if gps_ifd is not None:
+        tags.update(_read_ifd(buf, tiff_start, gps_ifd, _GPS_TAGS, structs))
+    return tags
+
+def read_gps_exif_fast(path):
+    """
+    Read only the EXIF tags this module uses (orientation, image description,
+    original date/time and GPS position) from a JPEG, without parsing the rest
+    of the metadata (MakerNotes, thumbnails, ...).
+    Returns a dict keyed like the exif package's attributes, e.g.
+    { "gps_latitude": (21.0, 18.0, 5.2), "gps_latitude_ref": "N", ... },
+    or None if the file has no readable EXIF.
+    """
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+    with buf:
+        try:
+            return _read_exif_segment(buf)
+        except (struct.error, IndexError):  # truncated or corrupt EXIF
+            return None
+
 def parse_image_description(description):
     """
-    Given a string like "key1-value1;key2-value2", parse and return a dict:
+    Given a string like "Key1-value1;key2-value2", parse and return a dict
+    with lowercase keys:
     { "key1": "value1", "key2": "value2" }
     Ignores any empty or badly formed segments.
     """
-    meta_dict = {}
     if not description:
-        return meta_dict
+        return {}
+    return {key.lower(): value for key, value in _KEY_VALUE_PATTERN.findall(description)}
 
-    pairs = description.split(';')
-    for pair in pairs:
-        pair = pair.strip()
-        if not pair:
-            continue
-        kv = pair.split('-', 1)  # split on the first dash only
-        if len(kv) == 2:
-            key, value = kv
-            key = key.strip()
-            value = value.strip()
-            meta_dict[key] = value
-    return meta_dict
+def _sql_identifier(name):
+    """
+    Quote a table or column name for use in SQLite statements.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+def _gpkg_blob_to_wkb(blob):
+    """
+    Strip the GeoPackage header (magic, version, flags, srs_id and optional
+    envelope) from a geometry blob, returning the plain WKB.
+    """
+    envelope_size = _GPKG_ENVELOPE_SIZES[(blob[3] >> 1) & 0x07]
+    return blob[8 + envelope_size:]
+
+@contextmanager
+def _gdal_config_options(options):
+    """
+    Set GDAL config options for the duration of the block, restoring the
+    previous values afterwards (GDAL config options are process-wide).
+    """
+    previous = {name: pyogrio.get_gdal_config_option(name) for name in options}
+    pyogrio.set_gdal_config_options(options)
+    try:
+        yield
+    finally:
+        pyogrio.set_gdal_config_options(previous)
+
+def _register_gpkg_functions(con):
+    """
+    Register the ST_* SQL functions called by the GeoPackage R-tree triggers,
+    which GDAL provides but a plain sqlite3 connection does not.
+    """
+    def bound(i):
+        def st_bound(blob):
+            if blob is None:
+                return None
+            return float(shapely.bounds(shapely.from_wkb(_gpkg_blob_to_wkb(blob)))[i])
+        return st_bound
+
+    # Bit 4 of the header flags marks an empty geometry
+    con.create_function(
+        'ST_IsEmpty', 1, lambda blob: None if blob is None else (blob[3] >> 4) & 1,
+        deterministic=True,
+    )
+    for name, i in (('ST_MinX', 0), ('ST_MinY', 1), ('ST_MaxX', 2), ('ST_MaxY', 3)):
+        con.create_function(name, 1, bound(i), deterministic=True)
+
+def _to_gpkg_blobs(geoms, srs_id):
+    """
+    Encode geometries as GeoPackage blobs: little-endian header without an
+    envelope, followed by ISO WKB.
+    """
+    header = b'GP\x00\x01' + struct.pack('<i', srs_id)
+    return [header + wkb for wkb in shapely.to_wkb(geoms, byte_order=1, flavor='iso')]
+
+def _update_gpkg_in_place(gpkg_path, info, stored_gdf, new_gdf, update_cols):
+    """
+    Apply new_gdf to a GPKG whose records are a superset of it, without
+    rewriting the file: in a single transaction, overwrite the `update_cols` of
+    the matching rows, move the points whose geometry changed and delete the
+    records not in new_gdf.
+    stored_gdf holds the stored filenames and geometries, indexed by fid.
+    """
+    layer = info['layer_name']
+    table = _sql_identifier(layer)
+    fid_col = _sql_identifier(info['fid_column'] or 'fid')
+    geom_col = _sql_identifier(info['geometry_name'])
+
+    fids = pd.Series(stored_gdf.index, index=stored_gdf['filename'])
+    new_gdf = new_gdf.set_index('filename')
+    new_fids = fids.loc[new_gdf.index].tolist()
+
+    values = new_gdf[update_cols].astype(object)
+    values = values.where(values.notna(), None)
+    set_clause = ', '.join(f"{_sql_identifier(c)} = ?" for c in update_cols)
+
+    stored_geoms = stored_gdf.set_index('filename').geometry.loc[new_gdf.index].values
+    moved = (
+        shapely.to_wkb(stored_geoms, flavor='iso')
+        != shapely.to_wkb(new_gdf.geometry.values, flavor='iso')
+    )
+
+    stale_fids = stored_gdf.index[~stored_gdf['filename'].isin(new_gdf.index)].tolist()
+    minx, miny, maxx, maxy = (float(v) for v in new_gdf.geometry.total_bounds)
+
+    con = sqlite3.connect(gpkg_path, isolation_level=None)
+    try:
+        _register_gpkg_functions(con)
+        (srs_id,) = con.execute(
+            "SELECT srs_id FROM gpkg_geometry_columns WHERE table_name = ?", (layer,)
+        ).fetchone()
+
+        con.execute("BEGIN")
+        if update_cols:
+            con.executemany(
+                f"UPDATE {table} SET {set_clause} WHERE {fid_col} = ?",
+                (row + (fid,) for row, fid in zip(values.itertuples(index=False, name=None), new_fids)),
+            )
+        if moved.any():
+            con.executemany(
+                f"UPDATE {table} SET {geom_col} = ? WHERE {fid_col} = ?",
+                zip(_to_gpkg_blobs(new_gdf.geometry.values[moved], srs_id),
+                    [fid for fid, m in zip(new_fids, moved) if m]),
+            )
+        con.executemany(f"DELETE FROM {table} WHERE {fid_col} = ?", ((fid,) for fid in stale_fids))
+        con.execute(
+            "UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ?, "
+            "last_change = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE table_name = ?",
+            (minx, miny, maxx, maxy, layer),
+        )
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+def _content_hash(gdf, meta_df):
+    """
+    MD5 of a group's photo records and parsed metadata, used to detect
+    reruns over unchanged photos.
+    """
+    md5 = hashlib.md5()
+    for df in (gdf.drop(columns='geometry'), meta_df):
+        md5.update('\x00'.join(map(str, df.columns)).encode())
+        md5.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    md5.update(b''.join(shapely.to_wkb(gdf.geometry.values)))
+    return md5.hexdigest()
+
+def _is_up_to_date(gpkg_path, content_hash):
+    """
+    True if the GPKG was last written from records with this content hash
+    and has not been modified since (e.g. edited in QGIS).
+    """
+    try:
+        with open(gpkg_path + '.md5') as f:
+            stored_hash, stored_mtime = f.read().split()
+        return stored_hash == content_hash and int(stored_mtime) == os.stat(gpkg_path).st_mtime_ns
+    except (OSError, ValueError):
+        return False
+
+def _record_content_hash(gpkg_path, content_hash):
+    """
+    Store the content hash and modification time of a freshly written GPKG
+    in its .md5 sidecar file.
+    """
+    with open(gpkg_path + '.md5', 'w') as f:
+        f.write(f"{content_hash} {os.stat(gpkg_path).st_mtime_ns}\n")
+
+def _parse_one(photo_path, folder_key_word, folder_valid_values=None):
+    """
+    Read one photo and build its _PhotoRecord. Returns None if the photo is skipped,
+    or an _InvalidFolderValue if its group value is not in folder_valid_values,
+    so the caller can raise with the offending path once all workers are done.
+    Lives at module level so it can be sent to worker processes.
+    """
+    final_key = folder_key_word.lower()
+    exif_tags = read_gps_exif_fast(photo_path)
+
+    if not (exif_tags and 'gps_latitude' in exif_tags and 'gps_longitude' in exif_tags):
+        print(f"Skipping {photo_path}: No valid GPS EXIF found.")
+        return None
+
+    alt = exif_tags.get('gps_altitude')
+
+    # Parse the image_description; keys come back lowercase
+    image_description = exif_tags.get('image_description')
+    desc_dict = parse_image_description(image_description)
+
+    # Check if final_key exists
+    if final_key not in desc_dict:
+        print(
+            f"Warning: '{folder_key_word}' key (any case) not found "
+            f"in description for {photo_path}. Skipping."
+        )
+        return None
+
+    group_value = desc_dict[final_key]
+
+    # If folder_valid_values is provided, check if the group_value is allowed.
+    if folder_valid_values is not None and group_value not in folder_valid_values:
+        return _InvalidFolderValue(photo_path, group_value)
+
+    return _PhotoRecord(
+        filename=os.path.basename(photo_path),
+        # (degrees, minutes, seconds) + ref, converted for all photos at once by the caller
+        latitude=exif_tags['gps_latitude'],
+        latitude_ref=exif_tags.get('gps_latitude_ref', 'N'),
+        longitude=exif_tags['gps_longitude'],
+        longitude_ref=exif_tags.get('gps_longitude_ref', 'E'),
+        altitude=alt,
+        image_description=image_description,
+        create_date=exif_tags.get('datetime_original'),
+        orientation=exif_tags.get('orientation'),
+        group_value=group_value,
+        parsed_dict=desc_dict,
+    )
+
+def _read_photos(executor, photo_paths, folder_key_word, folder_valid_values, chunksize):
+    """
+    Parse a batch of photos in the worker processes and return them as a GeoDataFrame
+    of the core fields plus a DataFrame of the parsed image_description metadata
+    (same index), or (None, None) if none of them are usable.
+    Raises ValueError if a group value is not in folder_valid_values.
+    """
+    final_key = folder_key_word.lower()
+    parse_one = partial(
+        _parse_one,
+        folder_key_word=folder_key_word,
+        folder_valid_values=folder_valid_values,
+    )
+    results = list(executor.map(parse_one, photo_paths, chunksize=chunksize))
+
+    for result in results:
+        if isinstance(result, _InvalidFolderValue):
+            raise ValueError(
+                f"Invalid folder value '{result.group_value}' for photo '{result.photo_path}'. "
+                f"Allowed values are: {folder_valid_values}"
+            )
+    records = [r for r in results if r]
+
+    if not records:
+        return None, None
+
+    # Transpose the records into one sequence per field
+    photos = _PhotoRecord(*zip(*records))
+
+    # Convert all coordinates to decimal degrees in one pass
+    lat_deg, lat_min, lat_sec = np.array(photos.latitude, dtype=np.float64).T.copy()
+    lon_deg, lon_min, lon_sec = np.array(photos.longitude, dtype=np.float64).T.copy()
+    lats = _dms_arrays_to_dd(lat_deg, lat_min, lat_sec, np.array(photos.latitude_ref))
+    lons = _dms_arrays_to_dd(lon_deg, lon_min, lon_sec, np.array(photos.longitude_ref))
+
+    # Build all points at once; 3D geometry if altitude present
+    alts = np.array(
+        [np.nan if alt is None else alt for alt in photos.altitude], dtype=np.float64
+    )
+    has_alt = ~np.isnan(alts)
+    geoms = shapely.points(lons, lats)
+    geoms[has_alt] = shapely.points(lons[has_alt], lats[has_alt], alts[has_alt])
+
+    photos_gdf = gpd.GeoDataFrame(
+        {
+            'filename': photos.filename,
+            'latitude': lats,
+            'longitude': lons,
+            'altitude': alts,
+            'image_description': photos.image_description,
+            'create_date': photos.create_date,
+            'orientation': photos.orientation,
+            # Force the grouping column to final_key (lowercase)
+            final_key: photos.group_value,
+        },
+        geometry=geoms,
+        crs="EPSG:4326",
+    )
+    # Parsed image_description metadata, one column per key
+    meta_df = pd.DataFrame.from_records(photos.parsed_dict)
+    return photos_gdf, meta_df
 
 def import_geotagged_photos_to_points(
         input_folder_path,
         output_folder_path,
-        folder_key_word,
+        folder_key_word=None,
         folder_valid_values=None  # New optional parameter.
 ):
     """
@@ -59,209 +510,227 @@ image_description, forcing the final column name to lowercase.
 - Update/append points by matching 'filename'.
 - Remove old records whose filename is not in the new set.
 - Save the GPKG, avoiding the duplicate column name error.
+* If there are no new photos or fields, update the GPKG in place instead of rewriting it.
+* Skip the group if its photos are unchanged since the last run and the GPKG
+  wasn't edited since (tracked in <group_value>.gpkg.md5).
 
+:param folder_key_word: Grouping key to look for in image_description. Calling
+without it (the old two-argument form) is deprecated and groups by 'folder'.
 :param folder_valid_values: Optional list of allowed values for the folder grouping.
 If provided, only images with a group value in this list are processed.
 """
+    if folder_key_word is None:
+        warnings.warn(
+            "Calling import_geotagged_photos_to_points without folder_key_word is "
+            "deprecated; pass folder_key_word='folder' explicitly.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        folder_key_word = 'folder'
 
     # Always use a lowercase version for the final column name
     final_key = folder_key_word.lower()
 
     # 1. Gather all JPG files
-    jpg_files = glob.glob(os.path.join(input_folder_path, '*.JPG')) \
-        + glob.glob(os.path.join(input_folder_path, '*.jpg'))
+    jpg_files = [
+        entry.path for entry in os.scandir(input_folder_path)
+        if entry.is_file() and entry.name.lower().endswith('.jpg')
+        and not entry.name.startswith('.')
+    ]
 
     if not jpg_files:
         print(f"No JPG files found in {input_folder_path}")
         return
 
-    all_records = []
-
-    # Parse each photo
-    for photo_path in jpg_files:
-        with open(photo_path, 'rb') as f:
-            img = ExifImage(f)
-
-        if img.has_exif and hasattr(img, 'gps_latitude') and hasattr(img, 'gps_longitude'):
-            lat = dms_to_dd(img.gps_latitude, getattr(img, 'gps_latitude_ref', 'N'))
-            lon = dms_to_dd(img.gps_longitude, getattr(img, 'gps_longitude_ref', 'E'))
-
-            alt = getattr(img, 'gps_altitude', None)
-            if isinstance(alt, tuple) and len(alt) == 2:  # ratio
-                alt = alt[0] / alt[1]
-
-            # Parse the image_description and normalize keys to lowercase
-            image_description = getattr(img, 'image_description', None)
-            desc_dict = {k.lower(): v for k, v in parse_image_description(image_description).items()}
-
-            # Check if final_key exists
-            if final_key not in desc_dict:
-                print(
-                    f"Warning: '{folder_key_word}' key (any case) not found "
-                    f"in description for {photo_path}. Skipping."
+    # Parse the photos in chunks. With more than one chunk, each chunk is split by group
+    # and staged on disk, and nothing is written to the output folder until every photo
+    # has been read.
+    workers = os.cpu_count() or 1
+    stage_on_disk = len(jpg_files) > _CHUNK_SIZE
+    with tempfile.TemporaryDirectory() as staging_dir:
+        staged_groups = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_start in range(0, len(jpg_files), _CHUNK_SIZE):
+                chunk = jpg_files[chunk_start:chunk_start + _CHUNK_SIZE]
+                photos_gdf, meta_df = _read_photos(
+                    executor, chunk, folder_key_word, folder_valid_values,
+                    chunksize=max(1, len(chunk) // (8 * workers)),
                 )
+                if photos_gdf is None:
+                    continue
+
+                for i, (group_value, group_gdf) in enumerate(
+                        photos_gdf.groupby(final_key, sort=False)):
+                    group_meta_df = meta_df.loc[group_gdf.index].dropna(axis=1, how='all')
+                    staged = (group_gdf, group_meta_df)
+                    if stage_on_disk:
+                        staged = os.path.join(staging_dir, f"{chunk_start}_{i}.pkl")
+                        pd.to_pickle((group_gdf, group_meta_df), staged)
+                    staged_groups.setdefault(group_value, []).append(staged)
+                del photos_gdf, meta_df
+
+        if not staged_groups:
+            print(f"No valid geotagged photos found with '{folder_key_word}' metadata.")
+            return
+
+        # 2. Group photos by the final_key
+        # 3. For each group, create/update a GPKG
+        for group_value, group_staged in staged_groups.items():
+            # Load this group's photos from every chunk; the whole group is held in memory
+            staged = [pd.read_pickle(s) if stage_on_disk else s for s in group_staged]
+            new_gdf = pd.concat([gdf for gdf, _ in staged], ignore_index=True)
+            group_meta_df = pd.concat([meta for _, meta in staged], ignore_index=True)
+            del staged
+
+            # Subdirectory
+            folder_output_dir = os.path.join(output_folder_path, group_value)
+            os.makedirs(folder_output_dir, exist_ok=True)
+
+            # Output GPKG path
+            gpkg_path = os.path.join(folder_output_dir, f"{group_value}.gpkg")
+
+            # Metadata keys used by this group's photos
+            all_meta_keys = set(group_meta_df.columns)
+
+            # Skip the group if its photos are unchanged since the GPKG was last written
+            content_hash = _content_hash(new_gdf, group_meta_df)
+            if _is_up_to_date(gpkg_path, content_hash):
+                print(f"No changes for '{gpkg_path}'.")
                 continue
 
-            group_value = desc_dict[final_key]
-
-            # --- New Check ---
-            # If folder_valid_values is provided, check if the group_value is allowed.
-            if folder_valid_values is not None and group_value not in folder_valid_values:
-                raise ValueError(
-                    f"Invalid folder value '{group_value}' for photo '{photo_path}'. "
-                    f"Allowed values are: {folder_valid_values}"
-                )
-
-            record = {
-                'filename': os.path.basename(photo_path),
-                'latitude': lat,
-                'longitude': lon,
-                'altitude': alt,
-                'image_description': image_description,
-                'create_date': getattr(img, 'datetime_original', None),
-                'orientation': getattr(img, 'orientation', None),
-                # 3D geometry if altitude present
-                'geometry': Point(lon, lat, alt) if alt is not None else Point(lon, lat),
-                # Force the grouping column to final_key (lowercase)
-                final_key: group_value,
-                'parsed_dict': desc_dict,
-            }
-            all_records.append(record)
-        else:
-            print(f"Skipping {photo_path}: No valid GPS EXIF found.")
-
-    if not all_records:
-        print(f"No valid geotagged photos found with '{folder_key_word}' metadata.")
-        return
-
-    # 2. Group records by the final_key
-    grouped_records = defaultdict(list)
-    for record in all_records:
-        grouped_records[record[final_key]].append(record)
-
-    # 3. For each group, create/update a GPKG
-    for group_value, records in grouped_records.items():
-        # Subdirectory
-        folder_output_dir = os.path.join(output_folder_path, group_value)
-        os.makedirs(folder_output_dir, exist_ok=True)
-
-        # Output GPKG path
-        gpkg_path = os.path.join(folder_output_dir, f"{group_value}.gpkg")
-
-        # Gather distinct metadata keys from these records
-        all_meta_keys = set()
-        for rec in records:
-            all_meta_keys.update(rec['parsed_dict'].keys())
-
-        # Attempt to read existing GPKG
-        if os.path.exists(gpkg_path):
-            try:
-                existing_gdf = gpd.read_file(gpkg_path)
-                existing_columns = list(existing_gdf.columns)
-            except Exception as e:
-                print(f"Warning: Could not read existing file '{gpkg_path}': {e}")
-                existing_gdf = None
-                existing_columns = []
-        else:
-            existing_gdf = None
+            # Read the existing GPKG schema; its rows are only read if the merge keeps any
             existing_columns = []
+            if os.path.exists(gpkg_path):
+                try:
+                    info = pyogrio.read_info(gpkg_path)
+                    if info['features']:
+                        existing_columns = list(info['fields']) + ['geometry']
+                except Exception as e:
+                    print(f"Warning: Could not read existing file '{gpkg_path}': {e}")
+
+            # --- NEW STEP: If the existing GPKG has a column "F" that conflicts with "f", rename it. ---
+            # Because GeoPackage is case-insensitive, "F" and "f" collide. We'll unify them to final_key.
+            renamed_cols = {}
+            unified_cols = []
+            # We'll check for any columns that match final_key case-insensitively
+            for col in existing_columns:
+                if col.lower() == final_key and col != final_key:
+                    # e.g., col = "F", final_key = "f"
+                    # If there's already a "f" column, drop "F"; the kept records get
+                    # their "f" value from the photos
+                    if final_key in existing_columns:
+                        unified_cols.append(col)
+                    else:
+                        renamed_cols[col] = final_key
 
-        # --- NEW STEP: If the existing GPKG has a column "F" that conflicts with "f", rename it. ---
-        # Because GeoPackage is case-insensitive, "F" and "f" collide. We'll unify them to final_key.
-        renamed_cols = {}
-        # We'll check for any columns that match final_key case-insensitively
-        for col in existing_columns:
-            if col.lower() == final_key and col != final_key:
-                # e.g., col = "F", final_key = "f"
-                # If there's already a "f" column, unify them
-                if final_key in existing_columns:
-                    # unify data if needed
-                    existing_gdf[final_key] = existing_gdf[final_key].fillna(existing_gdf[col])
-                    # drop the old column
-                    existing_gdf.drop(columns=[col], inplace=True)
-                else:
-                    renamed_cols[col] = final_key
-
-        if renamed_cols:
-            existing_gdf.rename(columns=renamed_cols, inplace=True)
             # update columns list
-            existing_columns = list(existing_gdf.columns)
-
-        # If GPKG still exists, ensure new metadata keys are already in columns
-        if existing_gdf is not None and not existing_gdf.empty:
-            for k in all_meta_keys:
-                if k not in (final_key, 'parsed_dict', 'image_description'):
-                    # Because it's case-insensitive, compare lower
-                    col_lowers = [c.lower() for c in existing_columns]
-                    if k.lower() not in col_lowers:
-                        raise ValueError(
-                            f"Image metadata key '{k}' does not match a point field in "
-                            f"'{gpkg_path}'. Correct the key in the image or "
-                            f"create a new field named '{k}' in this GPKG."
-                        )
-
-        # Build new_gdf from the records
-        new_gdf = gpd.GeoDataFrame(records, crs="EPSG:4326")
-
-        # If no existing data => create new columns
-        if existing_gdf is None or existing_gdf.empty:
-            for meta_key in all_meta_keys:
-                if meta_key not in (final_key, 'parsed_dict', 'image_description'):
-                    if meta_key not in new_gdf.columns:
-                        new_gdf[meta_key] = None
-
-            # Populate
-            for i, row in new_gdf.iterrows():
-                desc_dict = row['parsed_dict']
-                for k, v in desc_dict.items():
-                    if k in new_gdf.columns:
-                        new_gdf.loc[i, k] = v
-        else:
-            # If GPKG exists, only update columns that are known
+            existing_columns = [renamed_cols.get(c, c) for c in existing_columns if c not in unified_cols]
+
+            # GeoPackage field names are case-insensitive, so match keys on lowercase
             existing_lower_map = {c.lower(): c for c in existing_columns}
-            for i, row in new_gdf.iterrows():
-                desc_dict = row['parsed_dict']
-                for k, v in desc_dict.items():
-                    kl = k.lower()
-                    if kl in existing_lower_map:
-                        actual_col = existing_lower_map[kl]
-                        new_gdf.loc[i, actual_col] = v
-
-        # Remove 'parsed_dict' column if not needed
-        if 'parsed_dict' in new_gdf.columns:
-            new_gdf.drop(columns=['parsed_dict'], inplace=True)
-
-        # Merge or create fresh
-        if existing_gdf is not None and not existing_gdf.empty:
-            all_cols = list(set(existing_gdf.columns) | set(new_gdf.columns))
-            existing_gdf = existing_gdf.reindex(columns=all_cols)
-            new_gdf = new_gdf.reindex(columns=all_cols)
-
-            # Update or append by matching 'filename'
-            for i, new_row in new_gdf.iterrows():
-                match = existing_gdf['filename'] == new_row['filename']
-                if match.any():
-                    idx = existing_gdf.index[match]
-                    for col in all_cols:
-                        if col != 'filename':
-                            existing_gdf.loc[idx, col] = new_row[col]
-                else:
-                    existing_gdf = pd.concat(
-                        [existing_gdf, new_row.to_frame().T], ignore_index=True
-                    )
 
-            # Remove old records not present in new_gdf
-            new_filenames = set(new_gdf['filename'])
-            existing_gdf = existing_gdf[existing_gdf['filename'].isin(new_filenames)]
+            # If GPKG still exists, ensure new metadata keys are already in columns
+            if existing_columns:
+                for k in all_meta_keys:
+                    if k not in (final_key, 'image_description'):
+                        if k.lower() not in existing_lower_map:
+                            raise ValueError(
+                                f"Image metadata key '{k}' does not match a point field in "
+                                f"'{gpkg_path}'. Correct the key in the image or "
+                                f"create a new field named '{k}' in this GPKG."
+                            )
+
+            # If no existing data => create new columns
+            if not existing_columns:
+                group_meta_df = group_meta_df.reindex(columns=sorted(all_meta_keys))
+            else:
+                # If GPKG exists, only update columns that are known; the parsed keys
+                # are already lowercase
+                known_cols = {k: existing_lower_map[k] for k in sorted(all_meta_keys) if k in existing_lower_map}
+                group_meta_df = group_meta_df.reindex(columns=list(known_cols)).rename(columns=known_cols)
+
+            # The core fields take precedence over same-named metadata keys
+            group_meta_df = group_meta_df.drop(columns=group_meta_df.columns.intersection(new_gdf.columns))
+            new_gdf = pd.concat([new_gdf, group_meta_df], axis=1)
+
+            # Merge or create fresh
+            if existing_columns:
+                stored_gdf = pyogrio.read_dataframe(
+                    gpkg_path,
+                    columns=[c for c in ('filename', 'image_description') if c in existing_columns],
+                    fid_as_index=True,
+                )
 
-            final_gdf = existing_gdf
-        else:
-            final_gdf = new_gdf
+                # Fields filled from keys of the stored descriptions come from the photos
+                # too, so a key removed from a description clears its field
+                stored_keys = set()
+                if 'image_description' in stored_gdf:
+                    for description in stored_gdf['image_description'].dropna().unique():
+                        stored_keys.update(parse_image_description(description))
+                cleared_cols = sorted(
+                    {existing_lower_map[k] for k in stored_keys if k in existing_lower_map}
+                    - set(new_gdf.columns)
+                )
+                new_gdf = new_gdf.reindex(columns=[*new_gdf.columns, *cleared_cols])
+
+                # Fields that come from the photos; the other fields only exist in the GPKG
+                photo_cols = list(new_gdf.columns)
+                new_fields = set(photo_cols) - set(existing_columns)
+                update_cols = [c for c in photo_cols if c not in ('filename', 'geometry')]
+                # Stored fields keep their order, new fields go at the end
+                all_cols = pd.Index(existing_columns).union(photo_cols, sort=False)
+                new_gdf = new_gdf.reindex(columns=all_cols)
+
+                kept_mask = stored_gdf['filename'].isin(new_gdf['filename'])
+
+                # Records sharing a filename (e.g. a feature copied in QGIS), or a layer
+                # whose declared dimension no longer matches the points, need the rewrite
+                if (
+                    kept_mask.any()
+                    and stored_gdf['filename'].is_unique
+                    and new_gdf['filename'].isin(stored_gdf['filename']).all()
+                    and not (new_fields or renamed_cols or unified_cols)
+                    and shapely.has_z(new_gdf.geometry.values).any() == info['geometry_type'].endswith(' Z')
+                ):
+                    # Same fields and no new photos: update the stored records in place
+                    _update_gpkg_in_place(gpkg_path, info, stored_gdf, new_gdf, update_cols)
+                    _record_content_hash(gpkg_path, content_hash)
+                    print(f"Updated {len(new_gdf)} records in '{gpkg_path}'.")
+                    continue
+
+                if kept_mask.any():
+                    # Overwrite the photo fields of the records matching by 'filename' and
+                    # keep their stored values of the GPKG-only fields; old records not
+                    # present in new_gdf are dropped
+                    gpkg_only_cols = [c for c in existing_columns if c not in photo_cols]
+                    stored_values = pyogrio.read_dataframe(
+                        gpkg_path, columns=['filename', *gpkg_only_cols], read_geometry=False
+                    )
+                    stored_values = stored_values.loc[stored_values['filename'].isin(new_gdf['filename'])]
+                    kept_gdf = new_gdf[photo_cols].merge(stored_values, on='filename', how='right')
 
-        # Save final GPKG
-        final_gdf.set_crs(epsg=4326, inplace=True)
-        final_gdf.to_file(gpkg_path, driver='GPKG')
-        print(f"Saved {len(final_gdf)} records to '{gpkg_path}'.")
+                    # Kept records stay in their stored order; append the new ones in one go
+                    unmatched_mask = ~new_gdf['filename'].isin(stored_values['filename'])
+                    final_gdf = pd.concat([kept_gdf, new_gdf.loc[unmatched_mask, photo_cols]], ignore_index=True)
+                    final_gdf = final_gdf.reindex(columns=all_cols)
+                else:
+                    # None of the old records are kept, only the existing fields
+                    final_gdf = new_gdf
+            else:
+                final_gdf = new_gdf
+
+            # Write larger groups in Hilbert curve order so nearby points share
+            # R-tree nodes
+            if len(final_gdf) > _HILBERT_SORT_MIN_FEATURES:
+                codes = final_gdf.geometry.hilbert_distance(level=15).to_numpy()
+                final_gdf = final_gdf.iloc[np.argsort(codes, kind='stable')].reset_index(drop=True)
+
+            # Save final GPKG
+            final_gdf.set_crs(epsg=4326, inplace=True)
+            with _gdal_config_options(_GDAL_CONFIG_OPTIONS):
+                pyogrio.write_dataframe(final_gdf, gpkg_path, layer=group_value, driver='GPKG')
+            _record_content_hash(gpkg_path, content_hash)
+            print(f"Saved {len(final_gdf)} records to '{gpkg_path}'.")
 
 
 # Example usage: